@@ -1,11 +1,25 @@
 """
 BMAuth - Biometric Authentication System for FastAPI
 """
+from typing import TYPE_CHECKING, Any
 
-__version__ = "0.3.0"
+__version__ = "0.4.0"
 __author__ = "Sami Melhem"
 __email__ = "SaMiLMelhem23@gmail.com"
 
-from .auth import BMAuth
+if TYPE_CHECKING:
+    from .auth import BMAuth
 
 __all__ = ["BMAuth"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve BMAuth on first access so importing the package (e.g. for the
+    # bmauth-dev-tunnel entry point) does not load FastAPI and the storage
+    # clients up front.
+    if name == "BMAuth":
+        from .auth import BMAuth
+
+        globals()[name] = BMAuth
+        return BMAuth
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
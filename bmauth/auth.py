@@ -1,25 +1,44 @@
 """
 Core BMAuth authentication class
 """
+from functools import lru_cache
 from os import getenv
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from pathlib import Path
+from urllib.parse import urlparse
 import secrets
 import base64
+import json
+import re
 import time
-import hashlib
 from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse as _BaseJSONResponse, HTMLResponse, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from .email_providers import EmailProvider, SendGridProvider
+from .webauthn import WebAuthnError, verify_assertion, verify_registration
 from .storage import (
     InMemoryStorage,
+    RedisStorage,
     StorageBackend,
     StorageError,
     SupabaseStorage,
 )
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class JSONResponse(_BaseJSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
 
 class RegisterRequest(BaseModel):
     email: str
@@ -56,54 +75,85 @@ class JoinDeviceRequest(BaseModel):
 DatabaseConfig = Union[StorageBackend, Dict[str, Any], None]
 
 
-def detect_device_info(user_agent: str) -> dict:
-    """
-    Parse User-Agent to detect device type and generate friendly name
+# Every User-Agent keyword detect_device_info looks at, matched in a single
+# left-to-right pass. "windows phone" is listed before "windows" so the longer
+# keyword wins at the same position.
+_UA_KEYWORD_RE = re.compile(
+    r"windows phone|mac os x|macintosh|macbook|blackberry|android|iphone|ipad|"
+    r"ipod|mobile|chrome|safari|firefox|edg|windows|linux",
+    re.IGNORECASE,
+)
+_MOBILE_KEYWORDS = frozenset({
+    'mobile', 'android', 'iphone', 'ipad',
+    'ipod', 'blackberry', 'windows phone'
+})
 
-    Args:
-        user_agent: HTTP User-Agent header string
 
-    Returns:
-        dict with device_type ("mobile" | "desktop"), device_name, os, and browser
-    """
-    ua_lower = user_agent.lower()
+# User-Agents are client-controlled and can be as large as the header limit,
+# so only strings up to this length are cached. Longer ones are parsed
+# directly, which keeps the LRU's footprint bounded in bytes, not just entries.
+_UA_CACHE_MAX_LENGTH = 512
+
+
+def _parse_user_agent(user_agent: str) -> Tuple[str, str, str]:
+    """Return (device_type, browser, os) for a User-Agent."""
+    found = {match.lower() for match in _UA_KEYWORD_RE.findall(user_agent)}
+    if 'windows phone' in found:
+        found.add('windows')
 
     # Detect mobile vs desktop
-    is_mobile = any(x in ua_lower for x in [
-        'mobile', 'android', 'iphone', 'ipad',
-        'ipod', 'blackberry', 'windows phone'
-    ])
+    is_mobile = not _MOBILE_KEYWORDS.isdisjoint(found)
 
     device_type = "mobile" if is_mobile else "desktop"
 
     # Parse browser
-    if 'chrome' in ua_lower and 'edg' not in ua_lower:
+    if 'chrome' in found and 'edg' not in found:
         browser = "Chrome"
-    elif 'safari' in ua_lower and 'chrome' not in ua_lower:
+    elif 'safari' in found and 'chrome' not in found:
         browser = "Safari"
-    elif 'firefox' in ua_lower:
+    elif 'firefox' in found:
         browser = "Firefox"
-    elif 'edg' in ua_lower:
+    elif 'edg' in found:
         browser = "Edge"
     else:
         browser = "Browser"
 
     # Parse OS and device
-    if 'iphone' in ua_lower:
+    if 'iphone' in found:
         os_name = "iPhone"
-    elif 'ipad' in ua_lower:
+    elif 'ipad' in found:
         os_name = "iPad"
-    elif 'android' in ua_lower:
+    elif 'android' in found:
         os_name = "Android"
-    elif 'macintosh' in ua_lower or 'mac os x' in ua_lower:
-        os_name = "MacBook" if 'macbook' in ua_lower else "Mac"
-    elif 'windows' in ua_lower:
+    elif 'macintosh' in found or 'mac os x' in found:
+        os_name = "MacBook" if 'macbook' in found else "Mac"
+    elif 'windows' in found:
         os_name = "Windows PC"
-    elif 'linux' in ua_lower:
+    elif 'linux' in found:
         os_name = "Linux"
     else:
         os_name = "Device"
 
+    return device_type, browser, os_name
+
+
+_parse_user_agent_cached = lru_cache(maxsize=4096)(_parse_user_agent)
+
+
+def detect_device_info(user_agent: str) -> dict:
+    """
+    Parse User-Agent to detect device type and generate friendly name
+
+    Args:
+        user_agent: HTTP User-Agent header string
+
+    Returns:
+        dict with device_type ("mobile" | "desktop"), device_name, os, and browser
+    """
+    if len(user_agent) <= _UA_CACHE_MAX_LENGTH:
+        device_type, browser, os_name = _parse_user_agent_cached(user_agent)
+    else:
+        device_type, browser, os_name = _parse_user_agent(user_agent)
     return {
         "device_type": device_type,
         "device_name": f"{browser} on {os_name}",
@@ -112,6 +162,61 @@ def detect_device_info(user_agent: str) -> dict:
     }
 
 
+# Constant parts of the WebAuthn options sent to the browser; only the
+# challenge, user and allowed credentials vary per request
+_CREATION_OPTIONS: Dict[str, Any] = {
+    "rp": {
+        "name": "BMAuth"
+    },
+    "pubKeyCredParams": [
+        {"type": "public-key", "alg": -7},   # ES256
+        {"type": "public-key", "alg": -257}  # RS256
+    ],
+    "authenticatorSelection": {
+        "authenticatorAttachment": "platform",
+        "requireResidentKey": False,
+        "userVerification": "required"
+    },
+    "timeout": 60000,  # 60 seconds
+    "attestation": "none"
+}
+_REQUEST_OPTIONS: Dict[str, Any] = {
+    "userVerification": "required",
+    "timeout": 60000
+}
+
+# Pre-encoded body of the constant /auth/status response
+_STATUS_BODY = b'{"status":"BMAuth active"}'
+
+
+# Body of the verification email; only the PIN changes between sends
+_VERIFY_EMAIL_TEMPLATE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 10px 10px 0 0; text-align: center;">
+        <h1 style="color: white; margin: 0;">🔐 Verify Your Email</h1>
+    </div>
+    <div style="background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px;">
+        <p style="font-size: 16px;">Your verification PIN is:</p>
+        <div style="background: white; padding: 20px; border-radius: 8px; text-align: center; margin: 20px 0;">
+            <span style="font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #667eea;">{pin}</span>
+        </div>
+        <p style="font-size: 14px; color: #666;">This PIN will expire in <strong>10 minutes</strong>.</p>
+        <p style="font-size: 14px; color: #666;">If you didn't request this verification, please ignore this email.</p>
+    </div>
+    <div style="text-align: center; margin-top: 20px; color: #999; font-size: 12px;">
+        <p>Powered by BMAuth - Biometric Authentication System</p>
+    </div>
+</body>
+</html>
+"""
+
+
 class BMAuth:
     """
     Biometric Authentication System for FastAPI
@@ -132,7 +237,8 @@ class BMAuth:
         Args:
             app: Optional FastAPI application instance
             database: Optional storage configuration. Pass a dict like
-                `{"provider": "supabase", "url": "...", "key": "..."}` to use Supabase.
+                `{"provider": "supabase", "url": "...", "key": "..."}` to use Supabase,
+                or `{"provider": "redis", "url": "redis://..."}` to use Redis.
             host: Host for WebAuthn (default: localhost)
             port: Port for server (default: 8000)
             email_api_key: SendGrid API key
@@ -141,6 +247,9 @@ class BMAuth:
         self.app = app
         self.port = port
         self.host = (host or getenv("BMAUTH_HOST") or "localhost").strip()
+        # WebAuthn RP ID: the bare, lowercased hostname browsers scope
+        # credentials to (any port in the configured host is dropped)
+        self.rp_id = urlparse(f"//{self.host}").hostname or self.host
         self._host_meta = {
             "public_url": f"http://{self.host}:{port}",
             "desktop_url": f"http://{self.host}:{port}",
@@ -151,6 +260,9 @@ class BMAuth:
         self.email_provider_instance: Optional[EmailProvider] = None
         if email_api_key and from_email:
             self.email_provider_instance = SendGridProvider(email_api_key, from_email)
+            if app is not None:
+                # Close the provider's pooled HTTP client with the app
+                app.router.on_shutdown.append(self.email_provider_instance.aclose)
         else:
             print(
                 "Warning: Email provider not configured. Email verification will not work."
@@ -178,6 +290,34 @@ class BMAuth:
         if provider in {"memory", "inmemory", "in-memory"}:
             return InMemoryStorage()
 
+        if provider == "redis":
+            url = database.get("url") or getenv("REDIS_URL")
+            if not url:
+                raise ValueError(
+                    "BMAuth: a Redis URL is required. "
+                    "Please provide 'url' in the database configuration, "
+                    "or set the REDIS_URL environment variable."
+                )
+
+            key_prefix = (
+                database.get("key_prefix")
+                or getenv("REDIS_KEY_PREFIX")
+                or "bmauth:"
+            )
+            max_connections = int(
+                database.get("max_connections")
+                or getenv("REDIS_MAX_CONNECTIONS")
+                or 50
+            )
+            try:
+                return RedisStorage(
+                    url=url,
+                    key_prefix=key_prefix,
+                    max_connections=max_connections,
+                )
+            except StorageError as exc:
+                raise ValueError(str(exc)) from exc
+
         if provider == "supabase":
             url = (
                 database.get("url")
@@ -233,7 +373,7 @@ class BMAuth:
         print("=" * 60)
         print(f"💻 Local Desktop URL: {self._host_meta['desktop_url']}")
         print(f"🌐 Public URL (shareable): {self._host_meta['public_url']}")
-        print(f"🔗 WebAuthn RP ID Host: {self.host}")
+        print(f"🔗 WebAuthn RP ID Host: {self.rp_id}")
         print("=" * 60)
         print("\nTesting Instructions:")
         print("1. Desktop: Open the local URL in your browser")
@@ -245,7 +385,7 @@ class BMAuth:
 
     def _generate_pin(self) -> str:
         """Generate a random 6-digit PIN"""
-        return str(secrets.randbelow(1000000)).zfill(6)
+        return f"{secrets.randbelow(1_000_000):06d}"
 
     def _is_pin_valid(self, email: str, pin: str) -> bool:
         """Validate PIN for given email"""
@@ -282,31 +422,7 @@ class BMAuth:
             return False
 
         subject = "Verify Your Email - BMAuth"
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        </head>
-        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 10px 10px 0 0; text-align: center;">
-                <h1 style="color: white; margin: 0;">🔐 Verify Your Email</h1>
-            </div>
-            <div style="background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px;">
-                <p style="font-size: 16px;">Your verification PIN is:</p>
-                <div style="background: white; padding: 20px; border-radius: 8px; text-align: center; margin: 20px 0;">
-                    <span style="font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #667eea;">{pin}</span>
-                </div>
-                <p style="font-size: 14px; color: #666;">This PIN will expire in <strong>10 minutes</strong>.</p>
-                <p style="font-size: 14px; color: #666;">If you didn't request this verification, please ignore this email.</p>
-            </div>
-            <div style="text-align: center; margin-top: 20px; color: #999; font-size: 12px;">
-                <p>Powered by BMAuth - Biometric Authentication System</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _VERIFY_EMAIL_TEMPLATE.format(pin=pin)
 
         return await self.email_provider_instance.send_email(
             to_email=email, subject=subject, html_content=html_content
@@ -316,56 +432,59 @@ class BMAuth:
         """Register authentication routes"""
         templates_dir = Path(__file__).parent / "templates"
 
+        # Templates are static, so read them once instead of on every GET. They
+        # are kept as UTF-8 bytes so responses skip the str -> bytes encode.
+        register_html = (templates_dir / "register.html").read_bytes()
+        login_html = (templates_dir / "login.html").read_bytes()
+        verify_html = (templates_dir / "verify.html").read_bytes()
+
         @self.app.get("/auth/register", response_class=HTMLResponse)
         async def register(request: Request):
             """Register a new user"""
-            register_html = templates_dir / "register.html"
-            return HTMLResponse(content=register_html.read_text(encoding='utf-8'), status_code=200)
+            return HTMLResponse(content=register_html, status_code=200)
 
         @self.app.get("/auth/login", response_class=HTMLResponse)
         async def login(request: Request):
             """Authenticate user"""
-            login_html = templates_dir / "login.html"
-            return HTMLResponse(content=login_html.read_text(encoding='utf-8'), status_code=200)
+            return HTMLResponse(content=login_html, status_code=200)
 
         @self.app.get("/auth/verify", response_class=HTMLResponse)
         async def verify(request: Request):
             """Email verification page"""
-            verify_html = templates_dir / "verify.html"
-            return HTMLResponse(content=verify_html.read_text(encoding='utf-8'), status_code=200)
+            return HTMLResponse(content=verify_html, status_code=200)
+
+        # Registration options are static apart from the challenge and user
+        # fields, so serialize them once and splice those values in per request.
+        # Placeholders use "$", which never appears in base64url output, and the
+        # user-supplied name is substituted last so it is never re-scanned.
+        creation_options_template = json.dumps({
+            "challenge": "$challenge$",
+            "user": {
+                "id": "$user_id$",
+                "name": "$user_name$",
+                "displayName": "$user_name$"
+            },
+            **_CREATION_OPTIONS,
+        }, separators=(",", ":")).encode("ascii")
 
         @self.app.post("/auth/register/begin")
         async def register_begin(req: RegisterRequest):
             """Begin registration - generate challenge for WebAuthn"""
-            # Generate random challenge
-            challenge = secrets.token_bytes(32)
-            challenge_b64 = base64.b64encode(challenge).decode('utf-8')
+            # Generate random challenge (base64url, no padding)
+            challenge_b64 = secrets.token_urlsafe(32)
 
             # Store challenge temporarily
             self.storage.set_challenge(req.email, challenge_b64)
 
-            return JSONResponse({
-                "challenge": challenge_b64,
-                "rp": {
-                    "name": "BMAuth"
-                },
-                "user": {
-                    "id": base64.b64encode(req.email.encode()).decode('utf-8'),
-                    "name": req.email,
-                    "displayName": req.email
-                },
-                "pubKeyCredParams": [
-                    {"type": "public-key", "alg": -7},   # ES256
-                    {"type": "public-key", "alg": -257}  # RS256
-                ],
-                "authenticatorSelection": {
-                    "authenticatorAttachment": "platform",
-                    "requireResidentKey": False,
-                    "userVerification": "required"
-                },
-                "timeout": 60000,  # 60 seconds
-                "attestation": "none"
-            })
+            user_id = base64.urlsafe_b64encode(req.email.encode()).rstrip(b"=")
+            user_name = json.dumps(req.email)[1:-1].encode("ascii")
+            body = (
+                creation_options_template
+                .replace(b"$challenge$", challenge_b64.encode("ascii"))
+                .replace(b"$user_id$", user_id)
+                .replace(b"$user_name$", user_name)
+            )
+            return Response(content=body, media_type="application/json")
 
         @self.app.post("/auth/register/complete")
         async def register_complete(
@@ -375,25 +494,36 @@ class BMAuth:
             email = cred.email
 
             # Verify challenge exists
-            if not self.storage.get_challenge(email):
+            challenge = self.storage.get_challenge(email)
+            if not challenge:
                 return JSONResponse({"error": "Invalid session"}, status_code=400)
 
+            # Check the response against the challenge and extract the
+            # credential public key that login signatures are verified with
+            credential_id = cred.credential.get("id")
+            try:
+                public_key = verify_registration(
+                    cred.credential, challenge, self.rp_id
+                )
+            except WebAuthnError:
+                return JSONResponse({"error": "Invalid credential"}, status_code=400)
+
             # Detect device info
             user_agent = request.headers.get("user-agent", "")
             device_info = detect_device_info(user_agent)
-            device_id = hashlib.sha256(f"{email}:{user_agent}".encode()).hexdigest()
+            now = time.time()
 
-            # Store user with multi-device structure
+            # Store user with multi-device structure, keyed by credential id
             self.storage.save_user(email, {
                 "email_verified": False,
                 "devices": {
-                    device_id: {
-                        "credential_id": cred.credential.get("id"),
-                        "public_key": cred.credential.get("response", {}).get("publicKey"),
+                    credential_id: {
+                        "credential_id": credential_id,
+                        "public_key": public_key,
                         "device_name": device_info["device_name"],
                         "device_type": device_info["device_type"],
-                        "registered_at": time.time(),
-                        "last_used": time.time()
+                        "registered_at": now,
+                        "last_used": now
                     }
                 }
             })
@@ -405,9 +535,9 @@ class BMAuth:
             pin = self._generate_pin()
             self.storage.set_verification_pin(email, {
                 "pin": pin,
-                "expires_at": time.time() + 600,  # 10 minutes
+                "expires_at": now + 600,  # 10 minutes
                 "attempts": 0,
-                "last_sent": time.time(),
+                "last_sent": now,
             })
 
             # Send verification email in background (non-blocking)
@@ -423,7 +553,7 @@ class BMAuth:
 
         @self.app.post("/auth/login/begin")
         async def login_begin(req: LoginRequest, request: Request):
-            """Begin login - check if THIS device is registered"""
+            """Begin login - offer every credential registered to the user"""
             email = req.email
 
             # Check if user exists
@@ -435,61 +565,62 @@ class BMAuth:
             if "credential_id" in user:
                 user_agent = request.headers.get("user-agent", "")
                 device_info = detect_device_info(user_agent)
-                device_id = hashlib.sha256(f"{email}:{user_agent}".encode()).hexdigest()
+                now = time.time()
 
                 old_data = user
                 user = {
                     "email_verified": old_data.get("email_verified", False),
                     "devices": {
-                        device_id: {
+                        old_data["credential_id"]: {
                             "credential_id": old_data["credential_id"],
                             "public_key": old_data["public_key"],
                             "device_name": device_info["device_name"],
                             "device_type": device_info["device_type"],
-                            "registered_at": old_data.get("created_at", time.time()),
-                            "last_used": time.time()
+                            "registered_at": old_data.get("created_at", now),
+                            "last_used": now
                         }
                     }
                 }
                 self.storage.save_user(email, user)
+            elif any(
+                key != device.get("credential_id")
+                for key, device in user["devices"].items()
+            ):
+                # Re-key devices stored under the legacy User-Agent hash
+                user["devices"] = {
+                    device["credential_id"]: device
+                    for device in user["devices"].values()
+                    if device.get("credential_id")
+                }
+                self.storage.save_user(email, user)
 
-            # Detect current device
-            user_agent = request.headers.get("user-agent", "")
-            device_info = detect_device_info(user_agent)
-            device_id = hashlib.sha256(f"{email}:{user_agent}".encode()).hexdigest()
-
-            # Check if THIS specific device is registered
             user_devices = user["devices"]
-            is_this_device_registered = device_id in user_devices
-
-            if not is_this_device_registered:
-                # Device not registered - cross-device flow temporarily disabled
+            if not user_devices:
+                # No device registered - cross-device flow temporarily disabled
+                user_agent = request.headers.get("user-agent", "")
                 return JSONResponse({
                     "registered": False,
                     "message": "This device is not registered yet. Cross-device linking will be available in a future release.",
-                    "device_info": device_info
+                    "device_info": detect_device_info(user_agent)
                 })
 
-            # Device IS registered - proceed with normal login
-            challenge = secrets.token_bytes(32)
-            challenge_b64 = base64.b64encode(challenge).decode('utf-8')
+            # Offer every registered credential; the browser picks the one its
+            # authenticator holds
+            challenge_b64 = secrets.token_urlsafe(32)
             self.storage.set_challenge(email, challenge_b64)
 
-            user_device = user_devices[device_id]
-
             return JSONResponse({
                 "registered": True,
                 "challenge": challenge_b64,
-                "allowCredentials": [{
-                    "type": "public-key",
-                    "id": user_device["credential_id"]
-                }],
-                "userVerification": "required",
-                "timeout": 60000
+                "allowCredentials": [
+                    {"type": "public-key", "id": credential_id}
+                    for credential_id in user_devices
+                ],
+                **_REQUEST_OPTIONS,
             })
 
         @self.app.post("/auth/login/complete")
-        async def login_complete(cred: LoginCredential, request: Request):
+        async def login_complete(cred: LoginCredential):
             """Complete login - verify signature and create QR session"""
             email = cred.email
 
@@ -503,20 +634,18 @@ class BMAuth:
             if not user:
                 return JSONResponse({"error": "User not found"}, status_code=404)
 
-            # Detect current device
-            user_agent = request.headers.get("user-agent", "")
-            device_id = hashlib.sha256(f"{email}:{user_agent}".encode()).hexdigest()
-
-            # In production, verify the signature with the stored public key
-            # For now, basic validation
-            user_devices = user["devices"]
-            if device_id not in user_devices:
-                return JSONResponse({"error": "Device not registered"}, status_code=401)
-
-            stored_credential_id = user_devices[device_id]["credential_id"]
-            received_credential_id = cred.credential.get("id")
-
-            if stored_credential_id != received_credential_id:
+            # Resolve the device from the credential the authenticator returned,
+            # then require a signature from that credential over this challenge.
+            # Devices registered before keys were captured have no public key
+            # and must register again.
+            user_device = user["devices"].get(cred.credential.get("id"))
+            if user_device is None or not user_device.get("public_key"):
+                return JSONResponse({"error": "Invalid credential"}, status_code=401)
+            try:
+                verify_assertion(
+                    cred.credential, user_device["public_key"], challenge, self.rp_id
+                )
+            except WebAuthnError:
                 return JSONResponse({"error": "Invalid credential"}, status_code=401)
 
             # Clean up challenge
@@ -530,7 +659,7 @@ class BMAuth:
                 )
 
             # Update last_used for this device
-            user_devices[device_id]["last_used"] = time.time()
+            user_device["last_used"] = time.time()
             self.storage.save_user(email, user)
 
             # # Create QR session automatically
@@ -597,10 +726,11 @@ class BMAuth:
                 )
 
             # Rate limiting: Check if last sent was less than 1 minute ago
+            now = time.time()
             existing_pin = self.storage.get_verification_pin(email)
             if existing_pin:
                 last_sent = existing_pin.get("last_sent", 0)
-                if time.time() - last_sent < 60:
+                if now - last_sent < 60:
                     return JSONResponse(
                         {"error": "Please wait before requesting a new PIN"},
                         status_code=429,
@@ -610,9 +740,9 @@ class BMAuth:
             pin = self._generate_pin()
             self.storage.set_verification_pin(email, {
                 "pin": pin,
-                "expires_at": time.time() + 600,  # 10 minutes
+                "expires_at": now + 600,  # 10 minutes
                 "attempts": 0,
-                "last_sent": time.time(),
+                "last_sent": now,
             })
 
             # Send email in background
@@ -731,7 +861,7 @@ class BMAuth:
         #     # Detect new device
         #     user_agent = request.headers.get("user-agent", "")
         #     device_info = detect_device_info(user_agent)
-        #     device_id = hashlib.sha256(f"{email}:{user_agent}".encode()).hexdigest()
+        #     device_id = req.credential.get("id")
 
         #     # Store new device
         #     user = self.storage.get_user(email)
@@ -739,7 +869,7 @@ class BMAuth:
         #         return JSONResponse({"error": "User not found"}, status_code=404)
         #     user_devices = user.setdefault("devices", {})
         #     user_devices[device_id] = {
-        #         "credential_id": req.credential.get("id"),
+        #         "credential_id": device_id,
         #         "public_key": req.credential.get("response", {}).get("publicKey"),
         #         "device_name": device_info["device_name"],
         #         "device_type": device_info["device_type"],
@@ -761,7 +891,7 @@ class BMAuth:
         @self.app.get("/auth/status")
         async def status():
             """Check authentication status"""
-            return JSONResponse({"status": "BMAuth active"})
+            return Response(content=_STATUS_BODY, media_type="application/json")
 
         @self.app.get("/auth/debug/storage")
         async def debug_storage():
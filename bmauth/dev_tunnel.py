@@ -13,6 +13,7 @@ from urllib.parse import urlparse
 
 
 LOCAL_TUNNEL_CMD = ["npx", "localtunnel"]
+TUNNEL_URL_RE = re.compile(r"(https://[^\s]+)")
 
 
 def _ensure_node_available() -> None:
@@ -29,8 +30,9 @@ def _ensure_node_available() -> None:
 
 
 def _pipe_stream(stream, prefix: str = "") -> None:
-    for line in iter(stream.readline, ""):
-        sys.stdout.write(f"{prefix}{line}")
+    write = sys.stdout.write
+    for line in stream:
+        write(prefix + line if prefix else line)
     stream.close()
 
 
@@ -67,7 +69,7 @@ def start_dev_tunnel(
     assert lt_proc.stdout is not None
     for line in lt_proc.stdout:
         sys.stdout.write(line)
-        match = re.search(r"(https://[^\s]+)", line)
+        match = TUNNEL_URL_RE.search(line)
         if match:
             tunnel_url = match.group(1)
             break
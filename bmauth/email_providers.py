@@ -1,7 +1,11 @@
 """
 Email provider implementations for BMAuth
 """
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Optional
+
+import httpx
 
 
 class EmailProvider(ABC):
@@ -15,6 +19,9 @@ class EmailProvider(ABC):
         """Send email and return success status"""
         pass
 
+    async def aclose(self) -> None:
+        """Release any resources held by the provider"""
+
 
 class SendGridProvider(EmailProvider):
     """SendGrid email provider (API-based)"""
@@ -23,29 +30,52 @@ class SendGridProvider(EmailProvider):
         super().__init__(from_email)
         self.api_key = api_key
         self.api_url = "https://api.sendgrid.com/v3/mail/send"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client for the running event loop.
+
+        httpx connections belong to the loop that opened them, so a client
+        created on another (possibly closed) loop is replaced rather than
+        reused. Sends on the same loop share pooled connections.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client_loop = loop
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=10.0,
+            )
+        return self._client
 
     async def send_email(self, to_email: str, subject: str, html_content: str) -> bool:
         """Send email via SendGrid API"""
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "personalizations": [{"to": [{"email": to_email}]}],
-                        "from": {"email": self.from_email},
-                        "subject": subject,
-                        "content": [{"type": "text/html", "value": html_content}],
-                    },
-                    timeout=10.0,
-                )
-                
-                return response.status_code == 202
-        except Exception as e:
+            response = await self._get_client().post(
+                self.api_url,
+                json={
+                    "personalizations": [{"to": [{"email": to_email}]}],
+                    "from": {"email": self.from_email},
+                    "subject": subject,
+                    "content": [{"type": "text/html", "value": html_content}],
+                },
+            )
+
+            return response.status_code == 202
+        except httpx.HTTPError as e:
             print(f"SendGrid email failed: {e}")
             return False
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client (runs as an app shutdown handler)"""
+        client, loop = self._client, self._client_loop
+        self._client = self._client_loop = None
+        # A client from another loop cannot be closed from this one; its
+        # connections went away with that loop
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
@@ -4,7 +4,14 @@ Storage backends for BMAuth.
 
 from .base import StorageBackend, StorageError
 from .memory import InMemoryStorage
+from .redis import RedisStorage
 from .supabase import SupabaseStorage
 
-__all__ = ["StorageBackend", "StorageError", "InMemoryStorage", "SupabaseStorage"]
+__all__ = [
+    "StorageBackend",
+    "StorageError",
+    "InMemoryStorage",
+    "RedisStorage",
+    "SupabaseStorage",
+]
 
@@ -6,6 +6,12 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 
+# Lifetimes for short-lived records. Backends that support native expiry use
+# these so abandoned entries do not accumulate.
+CHALLENGE_TTL_SECONDS = 60  # matches the WebAuthn ceremony timeout
+VERIFICATION_PIN_TTL_SECONDS = 600
+DEVICE_SESSION_TTL_SECONDS = 300
+
 
 class StorageError(RuntimeError):
     """Generic storage-related error."""
@@ -3,22 +3,80 @@ In-memory storage backend used by default for BMAuth.
 """
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
 from threading import RLock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .base import StorageBackend
+from .base import (
+    CHALLENGE_TTL_SECONDS,
+    DEVICE_SESSION_TTL_SECONDS,
+    VERIFICATION_PIN_TTL_SECONDS,
+    StorageBackend,
+)
+
+
+class _ExpiringDict:
+    """
+    Bounded mapping whose entries expire ``ttl`` seconds after being written.
+
+    All entries share one TTL, so insertion order is also expiry order and
+    stale or overflowing entries are dropped from the front in O(1).
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._prune()
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        self._prune()
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        data = self._data
+        while data:
+            expires_at, _ = data[next(iter(data))]
+            if expires_at > now and len(data) <= self._maxsize:
+                break
+            data.popitem(last=False)
 
 
 class InMemoryStorage(StorageBackend):
     """
     Non-persistent storage suitable for demos and tests.
+
+    Challenges, verification PINs and device sessions expire on their own
+    and each store is capped at ``max_pending`` entries, so abandoned flows
+    cannot grow memory without bound. User records are never evicted.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, max_pending: int = 100_000) -> None:
         self._users: Dict[str, Dict[str, Any]] = {}
-        self._challenges: Dict[str, str] = {}
-        self._pins: Dict[str, Dict[str, Any]] = {}
-        self._device_sessions: Dict[str, Dict[str, Any]] = {}
+        self._challenges = _ExpiringDict(CHALLENGE_TTL_SECONDS, max_pending)
+        self._pins = _ExpiringDict(VERIFICATION_PIN_TTL_SECONDS, max_pending)
+        self._device_sessions = _ExpiringDict(
+            DEVICE_SESSION_TTL_SECONDS, max_pending
+        )
         self._lock = RLock()
 
     def get_user(self, email: str) -> Optional[Dict[str, Any]]:
@@ -40,11 +98,11 @@ class InMemoryStorage(StorageBackend):
 
     def set_challenge(self, email: str, challenge: str) -> None:
         with self._lock:
-            self._challenges[email] = challenge
+            self._challenges.set(email, challenge)
 
     def delete_challenge(self, email: str) -> None:
         with self._lock:
-            self._challenges.pop(email, None)
+            self._challenges.pop(email)
 
     def get_verification_pin(self, email: str) -> Optional[Dict[str, Any]]:
         with self._lock:
@@ -53,11 +111,11 @@ class InMemoryStorage(StorageBackend):
 
     def set_verification_pin(self, email: str, payload: Dict[str, Any]) -> None:
         with self._lock:
-            self._pins[email] = payload.copy()
+            self._pins.set(email, payload.copy())
 
     def delete_verification_pin(self, email: str) -> None:
         with self._lock:
-            self._pins.pop(email, None)
+            self._pins.pop(email)
 
     def get_device_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         with self._lock:
@@ -66,18 +124,18 @@ class InMemoryStorage(StorageBackend):
 
     def set_device_session(self, session_id: str, payload: Dict[str, Any]) -> None:
         with self._lock:
-            self._device_sessions[session_id] = payload.copy()
+            self._device_sessions.set(session_id, payload.copy())
 
     def delete_device_session(self, session_id: str) -> None:
         with self._lock:
-            self._device_sessions.pop(session_id, None)
+            self._device_sessions.pop(session_id)
 
     def debug_snapshot(self) -> Dict[str, Any]:
         with self._lock:
             return {
                 "backend": "in-memory",
                 "users": {k: v.copy() for k, v in self._users.items()},
-                "challenges": self._challenges.copy(),
+                "challenges": dict(self._challenges.items()),
                 "verification_pins": {
                     k: v.copy() for k, v in self._pins.items()
                 },
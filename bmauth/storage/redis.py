@@ -0,0 +1,178 @@
+"""
+Redis-backed storage implementation for BMAuth.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from .base import (
+    CHALLENGE_TTL_SECONDS,
+    DEVICE_SESSION_TTL_SECONDS,
+    VERIFICATION_PIN_TTL_SECONDS,
+    StorageBackend,
+    StorageError,
+)
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
+class RedisStorage(StorageBackend):
+    """
+    Storage backend that keeps BMAuth state in Redis.
+
+    State is shared by every worker pointing at the same Redis instance, and
+    short-lived records (challenges, PINs, device sessions) are written with a
+    TTL so Redis expires them without a cleanup job.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        key_prefix: str = "bmauth:",
+        max_connections: int = 50,
+    ) -> None:
+        try:
+            import redis  # type: ignore
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise StorageError(
+                "Redis support requires the 'redis' package. "
+                "Install the optional dependency with `pip install bmauth[redis]`."
+            ) from exc
+
+        # A blocking pool caps connections per worker and makes callers wait
+        # for a free connection instead of failing when the cap is reached.
+        pool = redis.BlockingConnectionPool.from_url(
+            url, decode_responses=True, max_connections=max_connections
+        )
+        self._client = redis.Redis(connection_pool=pool)
+        self._redis_error = redis.RedisError
+        self._prefix = key_prefix
+
+    # region helpers
+    def _key(self, kind: str, identifier: str) -> str:
+        return f"{self._prefix}{kind}:{identifier}"
+
+    def _call(self, action: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return getattr(self._client, method)(*args, **kwargs)
+        except self._redis_error as exc:
+            raise StorageError(f"Redis {action} failed: {exc}") from exc
+
+    def _get_json(self, kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+        raw = self._call(f"get {kind}", "get", self._key(kind, identifier))
+        if raw is None:
+            return None
+        return _loads(raw)
+
+    def _set_json(
+        self,
+        kind: str,
+        identifier: str,
+        payload: Dict[str, Any],
+        ttl: Optional[int] = None,
+    ) -> None:
+        self._call(
+            f"set {kind}",
+            "set",
+            self._key(kind, identifier),
+            _dumps(payload),
+            ex=ttl,
+        )
+
+    def _delete(self, kind: str, identifier: str) -> None:
+        self._call(f"delete {kind}", "delete", self._key(kind, identifier))
+
+    # endregion
+
+    # region StorageBackend implementation
+    def get_user(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._get_json("user", email)
+
+    def save_user(self, email: str, payload: Dict[str, Any]) -> None:
+        self._set_json("user", email, payload)
+
+    def delete_user(self, email: str) -> None:
+        self._delete("user", email)
+
+    def get_challenge(self, email: str) -> Optional[str]:
+        return self._call("get challenge", "get", self._key("challenge", email))
+
+    def set_challenge(self, email: str, challenge: str) -> None:
+        self._call(
+            "set challenge",
+            "set",
+            self._key("challenge", email),
+            challenge,
+            ex=CHALLENGE_TTL_SECONDS,
+        )
+
+    def delete_challenge(self, email: str) -> None:
+        self._delete("challenge", email)
+
+    def get_verification_pin(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._get_json("pin", email)
+
+    def set_verification_pin(self, email: str, payload: Dict[str, Any]) -> None:
+        self._set_json("pin", email, payload, VERIFICATION_PIN_TTL_SECONDS)
+
+    def delete_verification_pin(self, email: str) -> None:
+        self._delete("pin", email)
+
+    def get_device_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._get_json("device_session", session_id)
+
+    def set_device_session(self, session_id: str, payload: Dict[str, Any]) -> None:
+        self._set_json(
+            "device_session", session_id, payload, DEVICE_SESSION_TTL_SECONDS
+        )
+
+    def delete_device_session(self, session_id: str) -> None:
+        self._delete("device_session", session_id)
+
+    # endregion
+
+    # region Utilities
+    def debug_snapshot(self) -> Dict[str, Any]:
+        sections: Dict[str, Any] = {}
+        for kind in ("user", "challenge", "pin", "device_session"):
+            prefix = self._key(kind, "")
+            entries: Dict[str, Any] = {}
+            try:
+                keys = list(self._client.scan_iter(match=f"{prefix}*", count=500))
+                # Fetch values in MGET batches instead of one GET round trip
+                # per key
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    for key, raw in zip(batch, self._client.mget(batch)):
+                        if raw is None:
+                            continue
+                        entries[key[len(prefix):]] = (
+                            raw if kind == "challenge" else _loads(raw)
+                        )
+            except self._redis_error as exc:
+                sections[kind] = {"error": str(exc)}
+            else:
+                sections[kind] = entries
+
+        return {
+            "backend": "redis",
+            "key_prefix": self._prefix,
+            "users": sections["user"],
+            "challenges": sections["challenge"],
+            "verification_pins": sections["pin"],
+            "device_sessions": sections["device_session"],
+        }
+
+    # endregion
@@ -57,9 +57,11 @@ class SupabaseStorage(StorageBackend):
 
         return getattr(response, "data", None)
 
-    def _single(self, table: str, key: str, value: str) -> Optional[Dict[str, Any]]:
+    def _single(
+        self, table: str, key: str, value: str, columns: str = "*"
+    ) -> Optional[Dict[str, Any]]:
         data = self._execute(
-            self._client.table(table).select("*").eq(key, value).limit(1),
+            self._client.table(table).select(columns).eq(key, value).limit(1),
             f"select from {table}",
         )
         if not data:
@@ -70,7 +72,7 @@ class SupabaseStorage(StorageBackend):
 
     # region StorageBackend implementation
     def get_user(self, email: str) -> Optional[Dict[str, Any]]:
-        row = self._single(self._tables["users"], "email", email)
+        row = self._single(self._tables["users"], "email", email, "payload")
         if not row:
             return None
         return row.get("payload") or {}
@@ -90,7 +92,7 @@ class SupabaseStorage(StorageBackend):
         )
 
     def get_challenge(self, email: str) -> Optional[str]:
-        row = self._single(self._tables["challenges"], "email", email)
+        row = self._single(self._tables["challenges"], "email", email, "challenge")
         if not row:
             return None
         return row.get("challenge")
@@ -110,7 +112,7 @@ class SupabaseStorage(StorageBackend):
         )
 
     def get_verification_pin(self, email: str) -> Optional[Dict[str, Any]]:
-        row = self._single(self._tables["pins"], "email", email)
+        row = self._single(self._tables["pins"], "email", email, "payload")
         if not row:
             return None
         return row.get("payload") or {}
@@ -131,7 +133,7 @@ class SupabaseStorage(StorageBackend):
 
     def get_device_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         row = self._single(
-            self._tables["device_sessions"], "session_id", session_id
+            self._tables["device_sessions"], "session_id", session_id, "payload"
         )
         if not row:
             return None
@@ -0,0 +1,265 @@
+"""
+WebAuthn response verification for BMAuth
+"""
+import base64
+import hashlib
+import hmac
+import json
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+from urllib.parse import urlparse
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+
+# authenticatorData flag bits
+_FLAG_USER_PRESENT = 0x01
+_FLAG_USER_VERIFIED = 0x04
+_FLAG_ATTESTED_CREDENTIAL = 0x40
+
+# COSE key parameters for the algorithms offered in pubKeyCredParams
+_COSE_KTY_EC2 = 2
+_COSE_KTY_RSA = 3
+_COSE_ALG_ES256 = -7
+_COSE_ALG_RS256 = -257
+_COSE_CRV_P256 = 1
+
+
+class WebAuthnError(ValueError):
+    """Raised when a WebAuthn response fails verification"""
+
+
+def b64url_decode(data: Any) -> bytes:
+    """Decode unpadded base64url as sent by the BMAuth templates"""
+    if not isinstance(data, str):
+        raise WebAuthnError("Expected a base64url string")
+    try:
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    except ValueError as exc:
+        raise WebAuthnError("Invalid base64url data") from exc
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _cbor_item(data: bytes, offset: int) -> Tuple[Any, int]:
+    """Decode one CBOR item at ``offset``; returns (value, next offset)"""
+    if offset >= len(data):
+        raise WebAuthnError("Truncated CBOR data")
+    major, info = data[offset] >> 5, data[offset] & 0x1F
+    offset += 1
+
+    if info < 24:
+        value = info
+    elif info <= 27:
+        size = 1 << (info - 24)
+        if offset + size > len(data):
+            raise WebAuthnError("Truncated CBOR data")
+        value = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+    else:
+        # Indefinite lengths are not used by authenticators
+        raise WebAuthnError("Unsupported CBOR encoding")
+
+    if major == 0:
+        return value, offset
+    if major == 1:
+        return -1 - value, offset
+    if major in (2, 3):
+        end = offset + value
+        if end > len(data):
+            raise WebAuthnError("Truncated CBOR data")
+        chunk = data[offset:end]
+        return (chunk if major == 2 else chunk.decode("utf-8")), end
+    if major == 4:
+        items = []
+        for _ in range(value):
+            item, offset = _cbor_item(data, offset)
+            items.append(item)
+        return items, offset
+    if major == 5:
+        mapping = {}
+        for _ in range(value):
+            key, offset = _cbor_item(data, offset)
+            mapping[key], offset = _cbor_item(data, offset)
+        return mapping, offset
+    if major == 6:
+        # Tags only annotate the item that follows
+        return _cbor_item(data, offset)
+    if major == 7 and value in (20, 21, 22):
+        return {20: False, 21: True, 22: None}[value], offset
+    raise WebAuthnError("Unsupported CBOR item")
+
+
+def _cbor_decode(data: bytes, offset: int = 0) -> Tuple[Any, int]:
+    try:
+        return _cbor_item(data, offset)
+    except (TypeError, UnicodeDecodeError, RecursionError) as exc:
+        raise WebAuthnError("Malformed CBOR data") from exc
+
+
+def _load_cose_key(cose_key: bytes) -> Any:
+    """Build a cryptography public key from a COSE_Key (ES256 or RS256)"""
+    params, _ = _cbor_decode(cose_key)
+    if not isinstance(params, dict):
+        raise WebAuthnError("Malformed credential public key")
+
+    kty, alg = params.get(1), params.get(3)
+    try:
+        if (
+            kty == _COSE_KTY_EC2
+            and alg == _COSE_ALG_ES256
+            and params.get(-1) == _COSE_CRV_P256
+        ):
+            return ec.EllipticCurvePublicNumbers(
+                int.from_bytes(params[-2], "big"),
+                int.from_bytes(params[-3], "big"),
+                ec.SECP256R1(),
+            ).public_key()
+        if kty == _COSE_KTY_RSA and alg == _COSE_ALG_RS256:
+            return rsa.RSAPublicNumbers(
+                int.from_bytes(params[-2], "big"),
+                int.from_bytes(params[-1], "big"),
+            ).public_key()
+    except (KeyError, TypeError, ValueError) as exc:
+        raise WebAuthnError("Malformed credential public key") from exc
+    raise WebAuthnError("Unsupported credential algorithm")
+
+
+@lru_cache(maxsize=1024)
+def _load_stored_public_key(public_key: str) -> Any:
+    """
+    Load a stored base64url COSE key; cached per key string.
+
+    Every login with the same credential would otherwise repeat the base64,
+    CBOR and key construction work. Keys are immutable and the cache is keyed
+    by the stored value itself, so a re-registered key is a fresh entry.
+    """
+    return _load_cose_key(b64url_decode(public_key))
+
+
+def _check_client_data(
+    credential: Dict[str, Any],
+    expected_type: str,
+    expected_challenge: str,
+    rp_id: str,
+) -> bytes:
+    """
+    Validate clientDataJSON against the ceremony, stored challenge and RP.
+
+    BMAuth does not set ``rp.id``, so browsers scope credentials to the
+    origin's host; the origin must therefore be served from ``rp_id``.
+    Returns the raw clientDataJSON bytes.
+    """
+    response = credential.get("response")
+    if not isinstance(response, dict):
+        raise WebAuthnError("Missing authenticator response")
+
+    raw = b64url_decode(response.get("clientDataJSON"))
+    try:
+        client_data = json.loads(raw)
+    except (ValueError, RecursionError) as exc:
+        raise WebAuthnError("Malformed clientDataJSON") from exc
+    if not isinstance(client_data, dict):
+        raise WebAuthnError("Malformed clientDataJSON")
+
+    if client_data.get("type") != expected_type:
+        raise WebAuthnError("Unexpected ceremony type")
+
+    challenge = client_data.get("challenge")
+    if not isinstance(challenge, str) or not hmac.compare_digest(
+        challenge.encode("utf-8", "surrogatepass"), expected_challenge.encode()
+    ):
+        raise WebAuthnError("Challenge mismatch")
+
+    origin = client_data.get("origin")
+    try:
+        host = urlparse(origin).hostname if isinstance(origin, str) else None
+    except ValueError as exc:
+        raise WebAuthnError("Malformed origin") from exc
+    if host != rp_id:
+        raise WebAuthnError("Origin does not match the RP ID")
+    return raw
+
+
+def _check_authenticator_data(auth_data: bytes, rp_id: str) -> int:
+    """Check the RP ID hash and user flags; returns the flags byte"""
+    if len(auth_data) < 37:
+        raise WebAuthnError("Truncated authenticator data")
+    if not hmac.compare_digest(
+        auth_data[:32], hashlib.sha256(rp_id.encode()).digest()
+    ):
+        raise WebAuthnError("RP ID mismatch")
+
+    flags = auth_data[32]
+    # Both ceremonies request userVerification "required"
+    if not flags & _FLAG_USER_PRESENT or not flags & _FLAG_USER_VERIFIED:
+        raise WebAuthnError("User was not verified")
+    return flags
+
+
+def verify_registration(
+    credential: Dict[str, Any], expected_challenge: str, rp_id: str
+) -> str:
+    """
+    Verify a navigator.credentials.create() response for the RP ``rp_id``.
+
+    Attestation statements are not checked (BMAuth requests ``"none"``).
+    Returns the credential public key as base64url-encoded COSE_Key bytes.
+    """
+    _check_client_data(credential, "webauthn.create", expected_challenge, rp_id)
+
+    attestation, _ = _cbor_decode(
+        b64url_decode(credential["response"].get("attestationObject"))
+    )
+    auth_data = attestation.get("authData") if isinstance(attestation, dict) else None
+    if not isinstance(auth_data, bytes):
+        raise WebAuthnError("Malformed attestation object")
+
+    flags = _check_authenticator_data(auth_data, rp_id)
+    if not flags & _FLAG_ATTESTED_CREDENTIAL:
+        raise WebAuthnError("No attested credential data")
+
+    # aaguid (16 bytes) follows the 37-byte header, then the credential id
+    if len(auth_data) < 55:
+        raise WebAuthnError("Truncated attested credential data")
+    id_length = int.from_bytes(auth_data[53:55], "big")
+    key_start = 55 + id_length
+    if auth_data[55:key_start] != b64url_decode(credential.get("id")):
+        raise WebAuthnError("Credential id mismatch")
+
+    _, key_end = _cbor_decode(auth_data, key_start)
+    cose_key = auth_data[key_start:key_end]
+    _load_cose_key(cose_key)  # reject algorithms login could not verify
+    return b64url_encode(cose_key)
+
+
+def verify_assertion(
+    credential: Dict[str, Any],
+    public_key: str,
+    expected_challenge: str,
+    rp_id: str,
+) -> None:
+    """
+    Verify a navigator.credentials.get() response for the RP ``rp_id``
+    against the stored public key (as returned by :func:`verify_registration`).
+    """
+    client_data_raw = _check_client_data(
+        credential, "webauthn.get", expected_challenge, rp_id
+    )
+    response = credential["response"]
+    auth_data = b64url_decode(response.get("authenticatorData"))
+    _check_authenticator_data(auth_data, rp_id)
+
+    signature = b64url_decode(response.get("signature"))
+    signed = auth_data + hashlib.sha256(client_data_raw).digest()
+    key = _load_stored_public_key(public_key)
+    try:
+        if isinstance(key, ec.EllipticCurvePublicKey):
+            key.verify(signature, signed, ec.ECDSA(hashes.SHA256()))
+        else:
+            key.verify(signature, signed, padding.PKCS1v15(), hashes.SHA256())
+    except InvalidSignature as exc:
+        raise WebAuthnError("Invalid signature") from exc
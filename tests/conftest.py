@@ -0,0 +1,6 @@
+"""
+Shared pytest configuration
+"""
+
+# test_app.py is a runnable demo app (uvicorn + Supabase env), not a test module
+collect_ignore = ["test_app.py"]
@@ -0,0 +1,29 @@
+"""
+User-Agent parsing cache tests
+"""
+from bmauth.auth import (
+    _UA_CACHE_MAX_LENGTH,
+    _parse_user_agent_cached,
+    detect_device_info,
+)
+
+IPHONE_UA = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+
+
+def test_short_user_agents_are_cached():
+    _parse_user_agent_cached.cache_clear()
+    detect_device_info(IPHONE_UA)
+    detect_device_info(IPHONE_UA)
+    assert _parse_user_agent_cached.cache_info().hits == 1
+
+
+def test_oversized_user_agents_bypass_the_cache():
+    _parse_user_agent_cached.cache_clear()
+    long_ua = IPHONE_UA + " x" * _UA_CACHE_MAX_LENGTH
+    info = detect_device_info(long_ua)
+
+    assert info == detect_device_info(IPHONE_UA)
+    assert _parse_user_agent_cached.cache_info().currsize == 1  # IPHONE_UA only
@@ -0,0 +1,116 @@
+"""
+Lazy migration of legacy device records in login_begin
+"""
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bmauth.auth import BMAuth
+from bmauth.storage import InMemoryStorage
+
+EMAIL = "user@example.com"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) Safari/605.1.15"
+
+
+class CountingStorage(InMemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.saves = 0
+
+    def save_user(self, email, payload):
+        self.saves += 1
+        super().save_user(email, payload)
+
+
+def _device(credential_id):
+    return {
+        "credential_id": credential_id,
+        "public_key": None,
+        "device_name": "Safari on Mac",
+        "device_type": "desktop",
+        "registered_at": 1.0,
+        "last_used": 1.0,
+    }
+
+
+@pytest.fixture
+def storage():
+    return CountingStorage()
+
+
+@pytest.fixture
+def client(storage):
+    app = FastAPI()
+    BMAuth(app, database=storage)
+    return TestClient(app, headers={"user-agent": USER_AGENT})
+
+
+def _seed(storage, user):
+    storage.save_user(EMAIL, user)
+    storage.saves = 0
+
+
+def _begin(client):
+    response = client.post("/auth/login/begin", json={"email": EMAIL})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_user_agent_keyed_devices_are_rekeyed_once(client, storage):
+    ua_key = hashlib.sha256(f"{EMAIL}:{USER_AGENT}".encode()).hexdigest()
+    _seed(storage, {
+        "email_verified": True,
+        "devices": {ua_key: _device("cred-1")},
+    })
+
+    first = _begin(client)
+    assert storage.get_user(EMAIL)["devices"] == {"cred-1": _device("cred-1")}
+    assert first["allowCredentials"] == [{"type": "public-key", "id": "cred-1"}]
+    assert storage.saves == 1
+
+    _begin(client)
+    assert storage.saves == 1
+
+
+def test_devices_without_credential_id_are_dropped(client, storage):
+    broken = _device(None)
+    _seed(storage, {
+        "email_verified": True,
+        "devices": {"legacy-a": _device("cred-1"), "legacy-b": broken},
+    })
+
+    assert _begin(client)["allowCredentials"] == [
+        {"type": "public-key", "id": "cred-1"}
+    ]
+    assert list(storage.get_user(EMAIL)["devices"]) == ["cred-1"]
+
+
+def test_single_credential_schema_is_migrated_once(client, storage):
+    _seed(storage, {
+        "email_verified": True,
+        "credential_id": "cred-1",
+        "public_key": None,
+        "created_at": 1.0,
+    })
+
+    _begin(client)
+    user = storage.get_user(EMAIL)
+    assert "credential_id" not in user
+    assert user["devices"]["cred-1"]["credential_id"] == "cred-1"
+    assert user["devices"]["cred-1"]["device_name"] == "Safari on Mac"
+    assert storage.saves == 1
+
+    _begin(client)
+    assert storage.saves == 1
+
+
+def test_credential_keyed_devices_are_left_alone(client, storage):
+    _seed(storage, {
+        "email_verified": True,
+        "devices": {"cred-1": _device("cred-1")},
+    })
+
+    _begin(client)
+    assert storage.saves == 0
@@ -0,0 +1,59 @@
+"""
+SendGrid provider HTTP client lifecycle tests
+"""
+import asyncio
+from functools import partial
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from bmauth.auth import BMAuth
+from bmauth.email_providers import SendGridProvider
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    transport = httpx.MockTransport(lambda request: httpx.Response(202))
+    monkeypatch.setattr(
+        httpx, "AsyncClient", partial(httpx.AsyncClient, transport=transport)
+    )
+    return SendGridProvider("key", "noreply@example.com")
+
+
+def _send(provider):
+    return provider.send_email("user@example.com", "Subject", "<p>Body</p>")
+
+
+def test_sends_on_one_loop_share_a_client(provider):
+    async def send_twice():
+        assert await _send(provider)
+        first = provider._client
+        assert await _send(provider)
+        return first
+
+    assert asyncio.run(send_twice()) is provider._client
+
+
+def test_new_event_loop_gets_a_new_client(provider):
+    assert asyncio.run(_send(provider))
+    first = provider._client
+    assert asyncio.run(_send(provider))
+    assert provider._client is not first
+
+
+def test_aclose_closes_the_client(provider):
+    async def send_and_close():
+        await _send(provider)
+        client = provider._client
+        await provider.aclose()
+        return client
+
+    assert asyncio.run(send_and_close()).is_closed
+    assert provider._client is None
+
+
+def test_bmauth_registers_provider_shutdown():
+    app = FastAPI()
+    auth = BMAuth(app, email_api_key="key", from_email="noreply@example.com")
+    assert auth.email_provider_instance.aclose in app.router.on_shutdown
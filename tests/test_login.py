@@ -0,0 +1,326 @@
+"""
+Login ceremony tests: a credential id alone must never be enough to log in
+"""
+import base64
+import hashlib
+import json
+import secrets
+
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bmauth.auth import BMAuth
+from bmauth.webauthn import _load_stored_public_key
+
+EMAIL = "user@example.com"
+ORIGIN = "http://localhost:8000"
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _cbor_head(major: int, n: int) -> bytes:
+    if n < 24:
+        return bytes([major << 5 | n])
+    for info, size in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if n < 1 << (8 * size):
+            return bytes([major << 5 | info]) + n.to_bytes(size, "big")
+    raise ValueError(n)
+
+
+def _cbor(value) -> bytes:
+    """Encode the CBOR subset used in attestation objects and COSE keys"""
+    if isinstance(value, int):
+        return _cbor_head(0, value) if value >= 0 else _cbor_head(1, -1 - value)
+    if isinstance(value, bytes):
+        return _cbor_head(2, len(value)) + value
+    if isinstance(value, str):
+        encoded = value.encode()
+        return _cbor_head(3, len(encoded)) + encoded
+    if isinstance(value, dict):
+        return _cbor_head(5, len(value)) + b"".join(
+            _cbor(k) + _cbor(v) for k, v in value.items()
+        )
+    raise TypeError(value)
+
+
+class FakeAuthenticator:
+    """Platform authenticator producing ES256 credentials and assertions"""
+
+    def __init__(self, origin: str = ORIGIN):
+        self.origin = origin
+        self.private_key = ec.generate_private_key(ec.SECP256R1())
+        self.credential_id = secrets.token_bytes(16)
+
+    @property
+    def id(self) -> str:
+        return _b64url(self.credential_id)
+
+    def _client_data(self, ceremony: str, challenge: str) -> bytes:
+        return json.dumps(
+            {"type": ceremony, "challenge": challenge, "origin": self.origin}
+        ).encode()
+
+    def _auth_data(self, flags: int, attested: bytes = b"") -> bytes:
+        rp_id = self.origin.split("://", 1)[1].split(":", 1)[0]
+        return (
+            hashlib.sha256(rp_id.encode()).digest()
+            + bytes([flags])
+            + (0).to_bytes(4, "big")
+            + attested
+        )
+
+    def create(self, challenge: str) -> dict:
+        numbers = self.private_key.public_key().public_numbers()
+        cose_key = _cbor({
+            1: 2, 3: -7, -1: 1,
+            -2: numbers.x.to_bytes(32, "big"),
+            -3: numbers.y.to_bytes(32, "big"),
+        })
+        attested = (
+            bytes(16)
+            + len(self.credential_id).to_bytes(2, "big")
+            + self.credential_id
+            + cose_key
+        )
+        attestation = _cbor({
+            "fmt": "none",
+            "attStmt": {},
+            "authData": self._auth_data(0x45, attested),
+        })
+        return {
+            "id": self.id,
+            "rawId": self.id,
+            "type": "public-key",
+            "response": {
+                "clientDataJSON": _b64url(self._client_data("webauthn.create", challenge)),
+                "attestationObject": _b64url(attestation),
+            },
+        }
+
+    def get(self, challenge: str, signer=None) -> dict:
+        client_data = self._client_data("webauthn.get", challenge)
+        auth_data = self._auth_data(0x05)
+        signature = (signer or self.private_key).sign(
+            auth_data + hashlib.sha256(client_data).digest(),
+            ec.ECDSA(hashes.SHA256()),
+        )
+        return {
+            "id": self.id,
+            "rawId": self.id,
+            "type": "public-key",
+            "response": {
+                "clientDataJSON": _b64url(client_data),
+                "authenticatorData": _b64url(auth_data),
+                "signature": _b64url(signature),
+                "userHandle": None,
+            },
+        }
+
+
+@pytest.fixture
+def auth():
+    return BMAuth(FastAPI())
+
+
+@pytest.fixture
+def client(auth):
+    return TestClient(auth.app)
+
+
+def _register(client, auth, authenticator):
+    options = client.post("/auth/register/begin", json={"email": EMAIL}).json()
+    response = client.post(
+        "/auth/register/complete",
+        json={"email": EMAIL, "credential": authenticator.create(options["challenge"])},
+    )
+    assert response.status_code == 200
+
+    user = auth.storage.get_user(EMAIL)
+    user["email_verified"] = True
+    auth.storage.save_user(EMAIL, user)
+
+
+def _begin_login(client):
+    options = client.post("/auth/login/begin", json={"email": EMAIL}).json()
+    assert options["registered"] is True
+    return options
+
+
+def test_login_with_valid_assertion(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    options = _begin_login(client)
+    assert options["allowCredentials"] == [
+        {"type": "public-key", "id": authenticator.id}
+    ]
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": authenticator.get(options["challenge"])},
+    )
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+
+def test_stored_public_key_is_loaded_once(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+    _load_stored_public_key.cache_clear()
+
+    for _ in range(3):
+        options = _begin_login(client)
+        response = client.post(
+            "/auth/login/complete",
+            json={"email": EMAIL, "credential": authenticator.get(options["challenge"])},
+        )
+        assert response.status_code == 200
+
+    info = _load_stored_public_key.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_login_rejects_bare_credential_id(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    options = _begin_login(client)
+    credential_id = options["allowCredentials"][0]["id"]
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": {"id": credential_id}},
+    )
+    assert response.status_code == 401
+
+
+def test_login_rejects_signature_from_other_key(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    options = _begin_login(client)
+    forged = authenticator.get(
+        options["challenge"], signer=ec.generate_private_key(ec.SECP256R1())
+    )
+    response = client.post(
+        "/auth/login/complete", json={"email": EMAIL, "credential": forged}
+    )
+    assert response.status_code == 401
+
+
+def test_login_rejects_replayed_assertion(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    old_challenge = _begin_login(client)["challenge"]
+    _begin_login(client)
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": authenticator.get(old_challenge)},
+    )
+    assert response.status_code == 401
+
+
+def test_login_rejects_device_without_public_key(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+    user = auth.storage.get_user(EMAIL)
+    user["devices"][authenticator.id]["public_key"] = None
+    auth.storage.save_user(EMAIL, user)
+
+    options = _begin_login(client)
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": authenticator.get(options["challenge"])},
+    )
+    assert response.status_code == 401
+
+
+def test_register_rejects_wrong_challenge(client):
+    client.post("/auth/register/begin", json={"email": EMAIL})
+    response = client.post(
+        "/auth/register/complete",
+        json={"email": EMAIL, "credential": FakeAuthenticator().create("not-it")},
+    )
+    assert response.status_code == 400
+
+
+def test_register_rejects_origin_outside_rp_id(client):
+    challenge = client.post("/auth/register/begin", json={"email": EMAIL}).json()["challenge"]
+    credential = FakeAuthenticator(origin="https://evil.example").create(challenge)
+    response = client.post(
+        "/auth/register/complete", json={"email": EMAIL, "credential": credential}
+    )
+    assert response.status_code == 400
+
+
+def test_login_rejects_origin_outside_rp_id(client, auth):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    authenticator.origin = "https://evil.example"
+    options = _begin_login(client)
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": authenticator.get(options["challenge"])},
+    )
+    assert response.status_code == 401
+
+
+def test_rp_id_follows_configured_host():
+    auth = BMAuth(FastAPI(), host="Auth.Example.com:8443")
+    client = TestClient(auth.app)
+    authenticator = FakeAuthenticator(origin="https://auth.example.com:8443")
+
+    _register(client, auth, authenticator)
+    options = _begin_login(client)
+    response = client.post(
+        "/auth/login/complete",
+        json={"email": EMAIL, "credential": authenticator.get(options["challenge"])},
+    )
+    assert response.status_code == 200
+
+
+MALFORMED_CLIENT_DATA = [
+    pytest.param(
+        json.dumps({"type": "{type}", "challenge": "{challenge}", "origin": "http://["}),
+        id="unparseable-origin",
+    ),
+    pytest.param("[" * 100000, id="deeply-nested-json"),
+]
+
+
+def _with_client_data(credential: dict, template: str, ceremony: str, challenge: str):
+    client_data = template.replace("{type}", ceremony).replace("{challenge}", challenge)
+    credential["response"]["clientDataJSON"] = _b64url(client_data.encode())
+    return credential
+
+
+@pytest.mark.parametrize("template", MALFORMED_CLIENT_DATA)
+def test_register_rejects_malformed_client_data(client, template):
+    challenge = client.post("/auth/register/begin", json={"email": EMAIL}).json()["challenge"]
+    credential = _with_client_data(
+        FakeAuthenticator().create(challenge), template, "webauthn.create", challenge
+    )
+    response = client.post(
+        "/auth/register/complete", json={"email": EMAIL, "credential": credential}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("template", MALFORMED_CLIENT_DATA)
+def test_login_rejects_malformed_client_data(client, auth, template):
+    authenticator = FakeAuthenticator()
+    _register(client, auth, authenticator)
+
+    challenge = _begin_login(client)["challenge"]
+    credential = _with_client_data(
+        authenticator.get(challenge), template, "webauthn.get", challenge
+    )
+    response = client.post(
+        "/auth/login/complete", json={"email": EMAIL, "credential": credential}
+    )
+    assert response.status_code == 401
@@ -0,0 +1,92 @@
+"""
+In-memory storage expiry and size-cap tests
+"""
+import pytest
+
+from bmauth.storage import InMemoryStorage, memory
+from bmauth.storage.base import CHALLENGE_TTL_SECONDS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(memory.time, "monotonic", fake)
+    return fake
+
+
+def test_entries_expire_after_ttl(clock):
+    store = memory._ExpiringDict(ttl=10, maxsize=10)
+    store.set("a", 1)
+
+    clock.now += 9.9
+    assert store.get("a") == 1
+    clock.now += 0.1
+    assert store.get("a") is None
+    assert store.items() == []
+
+
+def test_set_refreshes_expiry(clock):
+    store = memory._ExpiringDict(ttl=10, maxsize=10)
+    store.set("a", 1)
+    clock.now += 8
+    store.set("a", 2)
+
+    clock.now += 8
+    assert store.get("a") == 2
+
+
+def test_overflow_evicts_oldest_first(clock):
+    store = memory._ExpiringDict(ttl=10, maxsize=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.set("c", 3)
+
+    assert store.items() == [("b", 2), ("c", 3)]
+
+
+def test_set_moves_key_to_back_of_eviction_order(clock):
+    store = memory._ExpiringDict(ttl=10, maxsize=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.set("a", 3)
+    store.set("c", 4)
+
+    assert store.items() == [("a", 3), ("c", 4)]
+
+
+def test_prune_drops_expired_entries_from_the_front(clock):
+    store = memory._ExpiringDict(ttl=10, maxsize=10)
+    store.set("a", 1)
+    clock.now += 5
+    store.set("b", 2)
+    clock.now += 5
+
+    assert store.items() == [("b", 2)]
+
+
+def test_storage_challenges_expire(clock):
+    storage = InMemoryStorage(max_pending=2)
+    storage.set_challenge("user@example.com", "challenge")
+    assert storage.get_challenge("user@example.com") == "challenge"
+
+    clock.now += CHALLENGE_TTL_SECONDS
+    assert storage.get_challenge("user@example.com") is None
+
+
+def test_storage_users_are_not_capped(clock):
+    storage = InMemoryStorage(max_pending=2)
+    for i in range(5):
+        storage.save_user(f"user{i}@example.com", {"devices": {}})
+
+    clock.now += 10 ** 6
+    assert all(
+        storage.get_user(f"user{i}@example.com") is not None for i in range(5)
+    )
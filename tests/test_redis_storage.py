@@ -0,0 +1,201 @@
+"""
+Redis storage backend tests against an in-process fake of the redis client
+"""
+import fnmatch
+import json
+import sys
+import types
+
+import pytest
+from fastapi import FastAPI
+
+from bmauth.auth import BMAuth
+from bmauth.storage import RedisStorage, StorageError
+from bmauth.storage import redis as redis_storage
+
+EMAIL = "user@example.com"
+
+
+class FakeRedisError(Exception):
+    pass
+
+
+class FakeRedis:
+    """Dict-backed stand-in for redis.Redis(decode_responses=True)"""
+
+    def __init__(self, connection_pool):
+        self.connection_pool = connection_pool
+        self.data = {}
+        self.ttls = {}
+        self.calls = []
+        self.fail = False
+
+    def _record(self, name):
+        self.calls.append(name)
+        if self.fail:
+            raise FakeRedisError("connection refused")
+
+    def get(self, key):
+        self._record("get")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._record("set")
+        self.data[key] = value.decode() if isinstance(value, bytes) else value
+        self.ttls[key] = ex
+
+    def delete(self, key):
+        self._record("delete")
+        self.data.pop(key, None)
+        self.ttls.pop(key, None)
+
+    def mget(self, keys):
+        self._record("mget")
+        return [self.data.get(key) for key in keys]
+
+    def scan_iter(self, match, count):
+        self._record("scan_iter")
+        return iter([key for key in list(self.data) if fnmatch.fnmatchcase(key, match)])
+
+
+class FakePool:
+    def __init__(self, url, **kwargs):
+        self.url = url
+        self.kwargs = kwargs
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        return cls(url, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    module = types.SimpleNamespace(
+        Redis=FakeRedis, BlockingConnectionPool=FakePool, RedisError=FakeRedisError
+    )
+    monkeypatch.setitem(sys.modules, "redis", module)
+    return module
+
+
+@pytest.fixture
+def storage():
+    return RedisStorage("redis://localhost:6379/0")
+
+
+def test_key_layout_and_ttls(storage):
+    storage.save_user(EMAIL, {"devices": {}})
+    storage.set_challenge(EMAIL, "abc")
+    storage.set_verification_pin(EMAIL, {"pin": "123456"})
+    storage.set_device_session("session-1", {"email": EMAIL})
+
+    assert storage._client.ttls == {
+        f"bmauth:user:{EMAIL}": None,
+        f"bmauth:challenge:{EMAIL}": 60,
+        f"bmauth:pin:{EMAIL}": 600,
+        "bmauth:device_session:session-1": 300,
+    }
+    assert storage._client.data[f"bmauth:challenge:{EMAIL}"] == "abc"
+
+
+def test_records_round_trip_and_delete(storage):
+    storage.save_user(EMAIL, {"email_verified": True, "devices": {"c": {"n": 1}}})
+    storage.set_challenge(EMAIL, "abc")
+
+    assert storage.get_user(EMAIL) == {"email_verified": True, "devices": {"c": {"n": 1}}}
+    assert storage.get_challenge(EMAIL) == "abc"
+
+    storage.delete_user(EMAIL)
+    storage.delete_challenge(EMAIL)
+    assert storage.get_user(EMAIL) is None
+    assert storage.get_challenge(EMAIL) is None
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson"])
+def test_json_round_trip_with_either_serializer(monkeypatch, storage, serializer):
+    if serializer == "orjson":
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr(redis_storage, "_dumps", orjson.dumps)
+        monkeypatch.setattr(redis_storage, "_loads", orjson.loads)
+    else:
+        monkeypatch.setattr(redis_storage, "_dumps", json.dumps)
+        monkeypatch.setattr(redis_storage, "_loads", json.loads)
+
+    payload = {"pin": "012345", "attempts": 2, "expires_at": 1.5, "nested": [None, True]}
+    storage.set_verification_pin(EMAIL, payload)
+
+    raw = storage._client.data[f"bmauth:pin:{EMAIL}"]
+    assert isinstance(raw, str) and json.loads(raw) == payload
+    assert storage.get_verification_pin(EMAIL) == payload
+
+
+def test_redis_errors_are_wrapped(storage):
+    storage._client.fail = True
+    with pytest.raises(StorageError, match="Redis get user failed"):
+        storage.get_user(EMAIL)
+    with pytest.raises(StorageError, match="Redis set challenge failed"):
+        storage.set_challenge(EMAIL, "abc")
+
+
+def test_debug_snapshot_batches_reads_with_mget(storage):
+    for i in range(1200):
+        storage.save_user(f"user{i}@example.com", {"n": i})
+    storage.set_challenge(EMAIL, "abc")
+    storage._client.calls.clear()
+
+    snapshot = storage.debug_snapshot()
+
+    assert len(snapshot["users"]) == 1200
+    assert snapshot["users"]["user7@example.com"] == {"n": 7}
+    assert snapshot["challenges"] == {EMAIL: "abc"}
+    assert snapshot["verification_pins"] == {}
+    assert "get" not in storage._client.calls
+    # 1200 users in batches of 500, plus one batch for the challenge
+    assert storage._client.calls.count("mget") == 4
+
+
+def test_init_storage_reads_config(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    auth = BMAuth(FastAPI(), database={
+        "provider": "redis",
+        "url": "redis://cache:6379/1",
+        "key_prefix": "app:",
+        "max_connections": 8,
+    })
+
+    pool = auth.storage._client.connection_pool
+    assert pool.url == "redis://cache:6379/1"
+    assert pool.kwargs == {"decode_responses": True, "max_connections": 8}
+    assert auth.storage._key("user", EMAIL) == f"app:user:{EMAIL}"
+
+
+def test_init_storage_reads_environment(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://env:6379/0")
+    monkeypatch.setenv("REDIS_KEY_PREFIX", "env:")
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "12")
+    auth = BMAuth(FastAPI(), database={"provider": "redis"})
+
+    pool = auth.storage._client.connection_pool
+    assert pool.url == "redis://env:6379/0"
+    assert pool.kwargs["max_connections"] == 12
+    assert auth.storage._key("pin", EMAIL) == f"env:pin:{EMAIL}"
+
+
+def test_init_storage_defaults(monkeypatch):
+    for name in ("REDIS_KEY_PREFIX", "REDIS_MAX_CONNECTIONS"):
+        monkeypatch.delenv(name, raising=False)
+    auth = BMAuth(FastAPI(), database={"provider": "redis", "url": "redis://x"})
+
+    assert auth.storage._client.connection_pool.kwargs["max_connections"] == 50
+    assert auth.storage._key("user", EMAIL) == f"bmauth:user:{EMAIL}"
+
+
+def test_init_storage_requires_url(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    with pytest.raises(ValueError, match="Redis URL is required"):
+        BMAuth(FastAPI(), database={"provider": "redis"})
+
+
+def test_init_storage_reports_missing_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(ValueError, match=r"pip install bmauth\[redis\]"):
+        BMAuth(FastAPI(), database={"provider": "redis", "url": "redis://x"})